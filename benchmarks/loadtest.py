@@ -0,0 +1,333 @@
+# benchmarks/loadtest.py
+"""
+End-to-end load test for the Telegram bot.
+
+Starts local stand-ins for the Telegram Bot API, CoinGecko, Bubblemaps map-data
+and Score map-metadata (see benchmarks.loadtest_stubs), runs `python -m bot.bot`
+against them with a throwaway SQLite database, and drives N simulated chats
+through /start, a contract address analysis and "View Trader Bubble Map".
+
+Reports throughput, p50/p95/p99 reply latency per step and the CPU and memory
+usage of the bot's process tree (including the chromedriver and Chrome processes
+Selenium starts) and of the web server when --with-web is set.
+
+Usage:
+    python -m benchmarks.loadtest --chats 50 --tokens 10 --api-latency-ms 200 --api-error-rate 0.02
+
+"View Trader Bubble Map" needs Chrome and the Django view; pass --with-web to also
+start `manage.py runserver` against the same database, otherwise that step is
+expected to come back with the "couldn't generate the bubble map" reply.
+"""
+import argparse
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.loadtest_stubs import Behaviour, DataApiStub, TelegramStub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE_TABLES = (
+    "from django.db import connection\n"
+    "from bot.bot import TokenData, WatchedToken\n"
+    "with connection.schema_editor() as editor:\n"
+    "    editor.create_model(TokenData)\n"
+    "    editor.create_model(WatchedToken)\n"
+)
+
+# Each step: command to send, predicate for the reply that completes it, predicate for success
+STEPS = [
+    ('start',
+     lambda method, text: method == 'sendMessage' and text.startswith('Welcome'),
+     lambda method, text: True),
+    ('analyze',
+     lambda method, text: method == 'sendMessage' and ('Market Cap' in text or text.startswith('Sorry')),
+     lambda method, text: 'Market Cap' in text),
+    ('view_visual',
+     lambda method, text: method == 'sendPhoto' or text.startswith(('Sorry', 'Failed', 'Please analyze')),
+     lambda method, text: method == 'sendPhoto'),
+]
+
+
+# Samples CPU time, RSS and thread count of whole process trees from /proc (Linux only):
+# the bot with the chromedriver and Chrome processes Selenium starts under it, plus the web server.
+# CPU is tracked per process, so one that exits keeps the time it was last sampled with; only its
+# time since that last sample is lost.
+class ProcessSampler(threading.Thread):
+    def __init__(self, pids, interval=0.5):
+        super().__init__(daemon=True)
+        self.root_pids = list(pids)
+        self.interval = interval
+        self.samples = []  # (monotonic, CPU seconds since the first sample, total RSS, total threads, processes)
+        self._cpu = {}  # (pid, start time) -> CPU seconds when last sampled
+        self._baseline = None
+        self._stop_event = threading.Event()
+        self._clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+
+    # Child pids from /proc/<pid>/task/*/children, or None if the kernel lacks CONFIG_PROC_CHILDREN
+    def _children(self, pid):
+        children = []
+        try:
+            for task in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{task}/children") as f:
+                    children.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            return None if os.path.exists(f"/proc/{pid}") else []
+        except OSError:
+            return []
+        return children
+
+    def _parent_map(self):
+        parents = defaultdict(list)
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            fields = self._stat(int(entry))
+            if fields:
+                parents[int(fields[1])].append(int(entry))
+        return parents
+
+    def _stat(self, pid):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the command name start at stat field 3 (state)
+                return f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            return None
+
+    def process_tree(self):
+        pids, stack, parents = [], list(self.root_pids), None
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            children = self._children(pid)
+            if children is None:
+                # Fall back to every process's parent pid, read once per sample
+                if parents is None:
+                    parents = self._parent_map()
+                children = parents.get(pid, [])
+            stack.extend(children)
+        return pids
+
+    def sample(self):
+        rss = threads = processes = 0
+        for pid in self.process_tree():
+            fields = self._stat(pid)
+            if not fields:
+                continue
+            # The start time tells a reused pid apart from the process that exited
+            self._cpu[(pid, fields[19])] = (int(fields[11]) + int(fields[12])) / self._clock_ticks
+            threads += int(fields[17])
+            rss += int(fields[21]) * self._page_size
+            processes += 1
+        if not processes:
+            return None
+        if self._baseline is None:
+            self._baseline = sum(self._cpu.values())
+        return time.monotonic(), sum(self._cpu.values()) - self._baseline, rss, threads, processes
+
+    def run(self):
+        while not self._stop_event.is_set():
+            sample = self.sample()
+            if sample:
+                self.samples.append(sample)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        sample = self.sample()
+        if sample:
+            self.samples.append(sample)
+
+    def summary(self):
+        if len(self.samples) < 2:
+            return None
+        started, cpu_start = self.samples[0][:2]
+        ended, cpu_end = self.samples[-1][:2]
+        return {
+            'cpu_seconds': cpu_end - cpu_start,
+            'cpu_percent': 100 * (cpu_end - cpu_start) / max(ended - started, 1e-9),
+            # Sum of per-process RSS, pages shared between Chrome processes are counted in each
+            'peak_rss_mb': max(s[2] for s in self.samples) / 1e6,
+            'peak_threads': max(s[3] for s in self.samples),
+            'peak_processes': max(s[4] for s in self.samples),
+        }
+
+
+# Nearest-rank percentile: the smallest value with at least pct% of values at or below it
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+# One simulated chat going through the three steps `rounds` times
+def run_chat(telegram, chat_id, tokens, args, results):
+    for round_index in range(args.rounds):
+        token = tokens[(chat_id + round_index) % len(tokens)]
+        for name, is_final, is_success in STEPS:
+            since = telegram.mark(chat_id)
+            started = time.perf_counter()
+            if name == 'start':
+                telegram.send_text(chat_id, '/start')
+            elif name == 'analyze':
+                telegram.send_text(chat_id, f"{token} eth")
+            else:
+                telegram.press_button(chat_id, 'view_visual')
+            reply = telegram.wait_for_reply(chat_id, since, is_final, args.timeout)
+            if reply is None:
+                results[name].append(('timeout', None))
+                # Later steps depend on this one, skip the rest of the round
+                break
+            timestamp, method, text = reply
+            results[name].append(('ok' if is_success(method, text) else 'error', timestamp - started))
+            if args.think_ms:
+                time.sleep(args.think_ms / 1000)
+
+
+def bot_environment(args, telegram, data_api, workdir, bubble_map_url):
+    env = dict(os.environ)
+    env.update({
+        'TELEGRAM_TOKEN': '123456:loadtest',
+        'TELEGRAM_API_URL': telegram.api_url,
+        'COINGECKO_API_URL': data_api.coingecko_url,
+        'BUBBLEMAPS_API_URL': data_api.bubblemaps_url,
+        'SCORE_API_URL': data_api.score_url,
+        'BUBBLE_MAP_BASE_URL': bubble_map_url,
+        'DJANGO_SECRET_KEY': 'loadtest',
+        'DB_ENGINE': 'django.db.backends.sqlite3',
+        'DB_NAME': os.path.join(workdir, 'loadtest.sqlite3'),
+        'SHARED_CACHE_PATH': os.path.join(workdir, 'shared_cache.sqlite3'),
+        'WATCHLIST_REFRESH_INTERVAL': str(10 ** 6),
+        'PYTHONUNBUFFERED': '1',
+    })
+    env.pop('SNAPSHOT_DIR', None)
+    env.pop('SNAPSHOT_REPLAY', None)
+    return env
+
+
+def print_report(results, duration, resources, telegram, data_api):
+    print()
+    print(f"{'step':<14}{'ok':>6}{'error':>7}{'timeout':>9}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'max s':>9}")
+    total_replies = 0
+    for name, _, _ in STEPS:
+        outcomes = results[name]
+        latencies = [latency for _, latency in outcomes if latency is not None]
+        counts = defaultdict(int)
+        for outcome, _ in outcomes:
+            counts[outcome] += 1
+        total_replies += len(latencies)
+        row = [percentile(latencies, pct) for pct in (50, 95, 99, 100)]
+        print(f"{name:<14}{counts['ok']:>6}{counts['error']:>7}{counts['timeout']:>9}"
+              + ''.join(f"{value:>9.3f}" if value is not None else f"{'-':>9}" for value in row))
+    print()
+    print(f"Duration: {duration:.1f}s, throughput: {total_replies / duration:.2f} replies/s")
+    if resources:
+        print(f"Bot, browser and web processes: {resources['cpu_seconds']:.1f} CPU s ({resources['cpu_percent']:.0f}% avg), "
+              f"peak RSS {resources['peak_rss_mb']:.0f} MB, peak threads {resources['peak_threads']}, "
+              f"peak processes {resources['peak_processes']}")
+    print(f"Telegram API calls: {dict(telegram.request_counts)}")
+    print(f"Data API calls: {dict(data_api.request_counts)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chats', type=int, default=20, help='simulated chats running concurrently')
+    parser.add_argument('--rounds', type=int, default=1, help='conversations per chat')
+    parser.add_argument('--tokens', type=int, default=5, help='distinct contract addresses in the pool')
+    parser.add_argument('--nodes', type=int, default=500, help='nodes per Bubblemaps payload')
+    parser.add_argument('--links', type=int, default=1500, help='links per Bubblemaps payload')
+    parser.add_argument('--ramp-seconds', type=float, default=0, help='spread chat start times over this many seconds')
+    parser.add_argument('--think-ms', type=float, default=0, help='pause between steps of a chat')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds to wait for each reply')
+    parser.add_argument('--api-latency-ms', type=float, default=100)
+    parser.add_argument('--api-jitter-ms', type=float, default=20)
+    parser.add_argument('--api-error-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-latency-ms', type=float, default=20)
+    parser.add_argument('--telegram-jitter-ms', type=float, default=5)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.0)
+    parser.add_argument('--with-web', action='store_true', help='also run the Django bubble map view for screenshots')
+    parser.add_argument('--web-port', type=int, default=8765)
+    parser.add_argument('--json', help='write the raw results to this file')
+    args = parser.parse_args()
+
+    tokens = [f"0x{i:040x}" for i in range(1, args.tokens + 1)]
+    api_behaviour = dict(latency_ms=args.api_latency_ms, jitter_ms=args.api_jitter_ms, error_rate=args.api_error_rate)
+    telegram = TelegramStub(Behaviour(args.telegram_latency_ms, args.telegram_jitter_ms, args.telegram_error_rate, seed=1)).start()
+    data_api = DataApiStub(tokens, nodes=args.nodes, links=args.links, behaviours={
+        'coingecko': Behaviour(seed=2, **api_behaviour),
+        'bubblemaps': Behaviour(seed=3, **api_behaviour),
+        'score': Behaviour(seed=4, **api_behaviour),
+    }).start()
+
+    workdir = tempfile.mkdtemp(prefix='bubblemaps-loadtest-')
+    bubble_map_url = f"http://127.0.0.1:{args.web_port}"
+    env = bot_environment(args, telegram, data_api, workdir, bubble_map_url)
+    subprocess.run([sys.executable, '-c', CREATE_TABLES], cwd=REPO_ROOT, env=env, check=True)
+
+    log_path = os.path.join(workdir, 'bot.log')
+    processes = []
+    with open(log_path, 'w') as log:
+        if args.with_web:
+            processes.append(subprocess.Popen(
+                [sys.executable, 'manage.py', 'runserver', f"127.0.0.1:{args.web_port}", '--noreload'],
+                cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+            ))
+        bot_process = subprocess.Popen([sys.executable, '-m', 'bot.bot'], cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        processes.append(bot_process)
+        sampler = ProcessSampler(process.pid for process in processes)
+        try:
+            if not telegram.polling.wait(60) or bot_process.poll() is not None:
+                raise SystemExit(f"Bot did not start polling, see {log_path}")
+            print(f"Bot polling, driving {args.chats} chats x {args.rounds} rounds (log: {log_path})")
+
+            results = defaultdict(list)
+            sampler.start()
+            started = time.perf_counter()
+            threads = []
+            for index in range(args.chats):
+                thread = threading.Thread(target=run_chat, args=(telegram, 1000 + index, tokens, args, results), daemon=True)
+                threads.append(thread)
+                thread.start()
+                if args.ramp_seconds:
+                    time.sleep(args.ramp_seconds / args.chats)
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - started
+            sampler.stop()
+        finally:
+            for process in processes:
+                process.send_signal(signal.SIGINT)
+            for process in processes:
+                try:
+                    process.wait(15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            telegram.stop()
+            data_api.stop()
+
+    resources = sampler.summary()
+    print_report(results, duration, resources, telegram, data_api)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'args': vars(args),
+                'duration': duration,
+                'resources': resources,
+                'results': {name: outcomes for name, outcomes in results.items()},
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
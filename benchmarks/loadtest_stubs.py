@@ -0,0 +1,296 @@
+# benchmarks/loadtest_stubs.py
+"""
+Local stand-ins for the services the bot talks to, used by benchmarks.loadtest.
+
+TelegramStub emulates the subset of the Bot API the bot uses (long-polled
+getUpdates plus the send/answer methods) and records every reply per chat.
+DataApiStub serves CoinGecko, Bubblemaps map-data and Score map-metadata
+responses for a pool of synthetic tokens. Both inject configurable latency and
+errors.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+# Latency and error injection for one stub service
+class Behaviour:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            delay_ms = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+# Parse a form-encoded, multipart or JSON request body into a dict of text fields
+def parse_body(content_type, body):
+    if not body:
+        return {}
+    if content_type.startswith('application/json'):
+        return json.loads(body)
+    if content_type.startswith('multipart/form-data'):
+        message = BytesParser(policy=HTTP).parsebytes(b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name and not part.get_filename():
+                fields[name] = part.get_content()
+        return fields
+    return dict(parse_qsl(body.decode()))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._dispatch(b'')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self._dispatch(self.rfile.read(length))
+
+    def _dispatch(self, body):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        params.update(parse_body(self.headers.get('Content-Type', ''), body))
+        status, payload = self.server.stub.handle(url.path, params)
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Base class running a stub on a background ThreadingHTTPServer
+class StubServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.request_counts = Counter()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, path, params):
+        raise NotImplementedError
+
+
+# Emulates the Telegram Bot API for a single bot token
+class TelegramStub(StubServer):
+    BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Bubblemaps Bot', 'username': 'bubblemaps_loadtest_bot'}
+
+    def __init__(self, behaviour=None, **kwargs):
+        super().__init__(**kwargs)
+        self.behaviour = behaviour or Behaviour()
+        self.condition = threading.Condition()
+        self.pending_updates = []
+        self.replies = defaultdict(list)  # chat_id -> [(perf_counter timestamp, method, text)]
+        self.polling = threading.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+
+    # Base URL to hand to the bot, the token is appended by python-telegram-bot
+    @property
+    def api_url(self):
+        return self.url + '/bot'
+
+    def _message(self, chat_id, text, sender):
+        with self.condition:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+        message = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': sender,
+        }
+        if text is not None:
+            message['text'] = text
+        return message
+
+    def _user(self, chat_id):
+        return {'id': chat_id, 'is_bot': False, 'first_name': f"Load {chat_id}"}
+
+    def _push(self, update):
+        with self.condition:
+            update['update_id'] = self._next_update_id
+            self._next_update_id += 1
+            self.pending_updates.append(update)
+            self.condition.notify_all()
+
+    # Number of replies recorded for a chat so far; pass it to wait_for_reply as `since`
+    def mark(self, chat_id):
+        with self.condition:
+            return len(self.replies[chat_id])
+
+    def send_text(self, chat_id, text):
+        message = self._message(chat_id, text, self._user(chat_id))
+        if text.startswith('/'):
+            command_length = len(text.split()[0])
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': command_length}]
+        self._push({'message': message})
+
+    def press_button(self, chat_id, data):
+        self._push({'callback_query': {
+            'id': f"{chat_id}-{time.monotonic_ns()}",
+            'from': self._user(chat_id),
+            'chat_instance': str(chat_id),
+            'data': data,
+            'message': self._message(chat_id, 'Token analysis', self.BOT_USER),
+        }})
+
+    # Wait for the first reply after `since` that satisfies predicate(method, text)
+    def wait_for_reply(self, chat_id, since, predicate, timeout):
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                for timestamp, method, text in self.replies[chat_id][since:]:
+                    if predicate(method, text):
+                        return timestamp, method, text
+                since = len(self.replies[chat_id])
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def _get_updates(self, params):
+        offset = int(params.get('offset') or 0)
+        timeout = float(params.get('timeout') or 0)
+        deadline = time.monotonic() + timeout
+        self.polling.set()
+        with self.condition:
+            while True:
+                self.pending_updates = [u for u in self.pending_updates if u['update_id'] >= offset]
+                remaining = deadline - time.monotonic()
+                if self.pending_updates or remaining <= 0:
+                    return list(self.pending_updates[:100])
+                self.condition.wait(remaining)
+
+    def handle(self, path, params):
+        method = path.rsplit('/', 1)[-1]
+        self.request_counts[method] += 1
+        if method == 'getUpdates':
+            return 200, {'ok': True, 'result': self._get_updates(params)}
+
+        self.behaviour.delay()
+        if self.behaviour.should_fail():
+            return 500, {'ok': False, 'error_code': 500, 'description': 'Internal Server Error: injected'}
+
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': self.BOT_USER}
+        if method in ('sendMessage', 'sendPhoto'):
+            chat_id = int(params['chat_id'])
+            text = params.get('text') if method == 'sendMessage' else None
+            message = self._message(chat_id, text, self.BOT_USER)
+            if method == 'sendPhoto':
+                message['photo'] = [{'file_id': 'photo', 'file_unique_id': 'photo', 'width': 800, 'height': 600}]
+            with self.condition:
+                self.replies[chat_id].append((time.perf_counter(), method, text))
+                self.condition.notify_all()
+            return 200, {'ok': True, 'result': message}
+        # setMyCommands, answerCallbackQuery, deleteWebhook, ...
+        return 200, {'ok': True, 'result': True}
+
+
+# Emulates CoinGecko, Bubblemaps map-data and Score map-metadata for a pool of tokens
+class DataApiStub(StubServer):
+    def __init__(self, tokens, nodes=500, links=1500, behaviours=None, seed=42, **kwargs):
+        super().__init__(**kwargs)
+        self.tokens = list(tokens)
+        self.nodes = nodes
+        self.links = links
+        self.behaviours = behaviours or {}
+        self.seed = seed
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    @property
+    def coingecko_url(self):
+        return self.url + '/coingecko'
+
+    @property
+    def bubblemaps_url(self):
+        return self.url + '/bubblemaps/map-data'
+
+    @property
+    def score_url(self):
+        return self.url + '/score/map-metadata'
+
+    def _map_data(self, token):
+        # Generated once per token, then served from memory
+        with self._lock:
+            payload = self._payloads.get(token)
+            if payload is None:
+                rng = random.Random(f"{self.seed}-{token}")
+                nodes = [{'address': f"0x{rng.getrandbits(160):040x}", 'amount': rng.random() * 1e9} for _ in range(self.nodes)]
+                links = [{
+                    'source': rng.randrange(self.nodes),
+                    'target': rng.randrange(self.nodes),
+                    'forward': rng.random() * 1e6,
+                    'backward': rng.random() * 1e6,
+                } for _ in range(self.links)]
+                payload = json.dumps({'token_address': token, 'nodes': nodes, 'links': links}).encode()
+                self._payloads[token] = payload
+            return payload
+
+    def handle(self, path, params):
+        service = path.strip('/').split('/', 1)[0]
+        self.request_counts[service] += 1
+        behaviour = self.behaviours.get(service)
+        if behaviour:
+            behaviour.delay()
+            if behaviour.should_fail():
+                return 500, {'status': 'KO', 'message': 'injected error'}
+
+        if path == '/coingecko/coins/list':
+            return 200, [{'id': f"token-{i}", 'symbol': f"tk{i}", 'name': f"Token {i}", 'platforms': {'ethereum': token}}
+                         for i, token in enumerate(self.tokens)]
+        if path.startswith('/coingecko/coins/'):
+            index = int(path.rsplit('-', 1)[-1])
+            return 200, {'id': f"token-{index}", 'market_data': {
+                'market_cap': {'usd': 1e6 * (index + 1)},
+                'current_price': {'usd': 1.5 + index},
+                'total_volume': {'usd': 1e5 * (index + 1)},
+            }}
+        if path == '/bubblemaps/map-data':
+            return 200, self._map_data(params.get('token'))
+        if path == '/score/map-metadata':
+            return 200, {
+                'status': 'OK',
+                'decentralisation_score': 62.5,
+                'identified_supply': {'percent_in_cexs': 12.0, 'percent_in_contracts': 30.0},
+            }
+        return 404, {'status': 'KO', 'message': 'not found'}
@@ -0,0 +1,145 @@
+# benchmarks/map_data_memory.py
+"""
+Peak-memory benchmark for Bubblemaps map-data ingestion.
+
+Compares the old path (read the whole body as text, json.loads it, walk the dict
+tree) with the streaming parser in bot.map_data on a large saved payload.
+
+Usage:
+    python -m benchmarks.map_data_memory [path/to/map_data.json] [--nodes N] [--links N]
+
+If the fixture does not exist yet, a synthetic payload of the requested size is
+generated and saved there first, so later runs compare against the same file.
+
+Expect the streaming path to use roughly a quarter of the baseline's peak memory
+but about twice its CPU time: per-event parsing costs more than json.loads.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from bot.map_data import parse_map_data, aggregate_top_traders
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'map_data_large.json')
+
+
+# Function to write a synthetic map-data payload shaped like the Bubblemaps response
+def generate_fixture(path, node_count, link_count, seed=42):
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('{"version": 4, "chain": "eth", "token_address": "0x' + '0' * 40 + '", "nodes": [')
+        for i in range(node_count):
+            node = {
+                'address': f"0x{rng.getrandbits(160):040x}",
+                'amount': rng.random() * 1e9,
+                # Raw on-chain amounts routinely exceed int64
+                'raw_amount': rng.getrandbits(80),
+                'is_contract': rng.random() < 0.1,
+                'name': f"Wallet {i}",
+                'percentage': rng.random(),
+                'transaction_count': rng.randint(1, 5000),
+                'transfer_X721_count': None,
+                'transfer_count': rng.randint(1, 5000),
+            }
+            f.write((',' if i else '') + json.dumps(node))
+        f.write('], "links": [')
+        for i in range(link_count):
+            link = {
+                'source': rng.randrange(node_count),
+                'target': rng.randrange(node_count),
+                'forward': rng.random() * 1e6,
+                'backward': rng.random() * 1e6,
+            }
+            f.write((',' if i else '') + json.dumps(link))
+        f.write('], "token_links": []}')
+
+
+# Edge cases the streaming parser must accept wherever the old json path did
+def check_edge_cases():
+    payload = json.dumps({
+        'nodes': [
+            {'address': '0xa', 'amount': 100000000000000000000},
+            {'address': '0xb', 'amount': -100000000000000000000},
+        ],
+        'links': [{'source': 0, 'target': 1, 'forward': 1.5, 'backward': 2}],
+    }).encode()
+    map_data = parse_map_data(io.BytesIO(payload))
+    top_traders, trader_connections = aggregate_top_traders(map_data)
+    if top_traders != {'0xa': 3.5, '0xb': 3.5} or trader_connections != {'0xa-0xb': 1}:
+        raise SystemExit(f"Big-integer payload parsed incorrectly: {top_traders} {trader_connections}")
+
+
+# The pre-streaming ingestion path, kept here only as the benchmark baseline
+def baseline_ingest(path):
+    with open(path) as f:
+        text = f.read()
+    bubble_data = json.loads(text)
+    nodes = bubble_data.get('nodes', [])
+    trader_volume = defaultdict(float)
+    connections = defaultdict(int)
+    for link in bubble_data.get('links', []):
+        source_idx = link.get('source')
+        target_idx = link.get('target')
+        volume = link.get('forward', 0) + link.get('backward', 0)
+        source_address = nodes[source_idx]['address'] if source_idx < len(nodes) else None
+        target_address = nodes[target_idx]['address'] if target_idx < len(nodes) else None
+        if source_address and target_address:
+            trader_volume[source_address] += volume
+            trader_volume[target_address] += volume
+            connections[tuple(sorted([source_address, target_address]))] += 1
+    top_traders = sorted(trader_volume.items(), key=lambda x: x[1], reverse=True)[:5]
+    return {trader: volume for trader, volume in top_traders}
+
+
+def streaming_ingest(path):
+    with open(path, 'rb') as f:
+        map_data = parse_map_data(f)
+    top_traders, _ = aggregate_top_traders(map_data)
+    return top_traders
+
+
+def measure(func, path):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixture', nargs='?', default=DEFAULT_FIXTURE)
+    parser.add_argument('--nodes', type=int, default=100000)
+    parser.add_argument('--links', type=int, default=300000)
+    args = parser.parse_args()
+
+    check_edge_cases()
+    if not os.path.exists(args.fixture):
+        print(f"Generating fixture {args.fixture} ({args.nodes} nodes, {args.links} links)...")
+        generate_fixture(args.fixture, args.nodes, args.links)
+    size_mb = os.path.getsize(args.fixture) / 1e6
+    print(f"Fixture: {args.fixture} ({size_mb:.1f} MB)")
+
+    baseline_top, baseline_peak, baseline_time = measure(baseline_ingest, args.fixture)
+    streaming_top, streaming_peak, streaming_time = measure(streaming_ingest, args.fixture)
+
+    print(f"{'path':<12}{'peak MB':>12}{'seconds':>12}")
+    print(f"{'baseline':<12}{baseline_peak / 1e6:>12.1f}{baseline_time:>12.2f}")
+    print(f"{'streaming':<12}{streaming_peak / 1e6:>12.1f}{streaming_time:>12.2f}")
+    print(f"Peak memory reduced {baseline_peak / max(streaming_peak, 1):.1f}x")
+    if list(baseline_top) != list(streaming_top):
+        raise SystemExit("Top traders differ between baseline and streaming paths")
+
+
+if __name__ == '__main__':
+    main()
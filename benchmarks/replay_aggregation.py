@@ -0,0 +1,71 @@
+# benchmarks/replay_aggregation.py
+"""
+Offline benchmark and regression check for the map-data aggregation pipeline.
+
+Replays every recorded Bubblemaps snapshot in a snapshot store (see bot.snapshots,
+populated by running the bot with SNAPSHOT_DIR set) through parse_map_data and
+aggregate_top_traders, without touching the network or the database.
+
+Usage:
+    python -m benchmarks.replay_aggregation SNAPSHOT_DIR [--repeat N] [--output results.json] [--compare results.json]
+
+--output saves the aggregated top traders and connections per snapshot; --compare
+fails if the current code produces anything different from a saved run.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from bot.map_data import parse_map_data, aggregate_top_traders
+from bot.snapshots import SnapshotStore
+
+
+def replay(store, entry):
+    with store.open(entry.digest) as stream:
+        map_data = parse_map_data(stream)
+    return aggregate_top_traders(map_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('snapshot_dir')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.snapshot_dir)
+    entries = [entry for entry in store.entries('bubblemaps') if entry.status_code == 200]
+    if not entries:
+        raise SystemExit(f"No Bubblemaps snapshots in {args.snapshot_dir}")
+
+    results = {}
+    total = 0.0
+    print(f"{'token':<56}{'median s':>10}")
+    for entry in entries:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            top_traders, trader_connections = replay(store, entry)
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        total += median
+        results[entry.digest] = {'top_traders': top_traders, 'trader_connections': trader_connections}
+        print(f"{entry.chain + ':' + entry.address:<56}{median:>10.4f}")
+    print(f"{len(entries)} snapshots, {total:.4f}s total (median of {args.repeat} runs each)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            expected = json.load(f)
+        changed = [digest for digest, result in expected.items() if results.get(digest) != result]
+        if changed:
+            raise SystemExit(f"Aggregation results differ for {len(changed)} snapshot(s): {', '.join(d[:12] for d in changed)}")
+        print("Aggregation results match the saved run.")
+
+
+if __name__ == '__main__':
+    main()
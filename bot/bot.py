@@ -3,18 +3,23 @@ import os
 import django
 import requests
 from django.db import models
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Bot, BotCommand
+from django.core.cache import cache
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 from telegram.ext import ContextTypes
-from telegram.error import TimedOut
+from telegram.error import TimedOut, Forbidden, TelegramError
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import logging
 from dotenv import load_dotenv
-from collections import defaultdict
 from asgiref.sync import sync_to_async  # For async ORM queries
 import asyncio
+import json
+import time
+from collections import defaultdict
+from bot.map_data import parse_map_data, aggregate_top_traders
+from bot.snapshots import SnapshotStore
 
 # Load environment variables from .env file
 load_dotenv()
@@ -43,6 +48,17 @@ class TokenData(models.Model):
     class Meta:
         app_label = 'bot'
 
+# Django model for tokens a chat is watching for holder concentration changes
+class WatchedToken(models.Model):
+    chat_id = models.BigIntegerField()
+    contract_address = models.CharField(max_length=100)
+    chain = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'bot'
+        unique_together = ('chat_id', 'contract_address', 'chain')
+
 # Bot token and API configurations from .env
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 if not TELEGRAM_TOKEN:
@@ -56,86 +72,218 @@ SCORE_API_KEY = os.getenv('SCORE_API_KEY')
 if not (BUBBLEMAPS_API_URL and SCORE_API_URL):
     raise ValueError("Missing API URLs in .env file. Please set BUBBLEMAPS_API_URL and SCORE_API_URL.")
 
-COINGECKO_COINS_LIST_URL = "https://api.coingecko.com/api/v3/coins/list?include_platform=true"
-COINGECKO_COIN_DATA_URL = "https://api.coingecko.com/api/v3/coins/{}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false"
+# Watchlist refresher settings
+WATCHLIST_REFRESH_INTERVAL = int(os.getenv('WATCHLIST_REFRESH_INTERVAL', '900'))  # Seconds between refresh runs
+WATCHLIST_BATCH_SIZE = int(os.getenv('WATCHLIST_BATCH_SIZE', '10'))  # Tokens refreshed per run
+WATCHLIST_REQUEST_DELAY = float(os.getenv('WATCHLIST_REQUEST_DELAY', '2'))  # Seconds between upstream refreshes
+WATCHLIST_VOLUME_CHANGE = float(os.getenv('WATCHLIST_VOLUME_CHANGE', '0.25'))  # Relative top-trader volume change worth reporting
+
+# Last refresh time per (contract_address, chain), kept in memory so unchanged tokens cost no DB writes
+WATCHLIST_LAST_REFRESHED = {}
+
+# Raw upstream response snapshots: recorded when SNAPSHOT_DIR is set, served instead of the network when SNAPSHOT_REPLAY=True
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR')
+SNAPSHOT_REPLAY = os.getenv('SNAPSHOT_REPLAY', 'False') == 'True'
+SNAPSHOT_STORE = SnapshotStore(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+
+# Endpoint overrides, e.g. to point the bot at local stand-ins for load testing
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org/bot')
+COINGECKO_API_URL = os.getenv('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
+BUBBLE_MAP_BASE_URL = os.getenv('BUBBLE_MAP_BASE_URL', 'http://127.0.0.1:8000')
+
+COINGECKO_COINS_LIST_URL = COINGECKO_API_URL + "/coins/list?include_platform=true"
+COINGECKO_COIN_DATA_URL = COINGECKO_API_URL + "/coins/{}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false"
+
+# Map chain to CoinGecko platform
+COINGECKO_PLATFORMS = {
+    'eth': 'ethereum',
+    'bsc': 'binance-smart-chain',
+    'ftm': 'fantom',
+    'avax': 'avalanche',
+    'cro': 'cronos',
+    'arbi': 'arbitrum',
+    'poly': 'polygon-pos',
+    'base': 'base',
+    'sol': 'solana',
+    'sonic': 'sonic'  # Assuming CoinGecko supports this chain
+}
+
+# Shared cache lifetimes, in seconds
+COINGECKO_COIN_INDEX_TIMEOUT = 24 * 60 * 60
+TOKEN_SUMMARY_CACHE_TIMEOUT = 60 * 60
+BUBBLE_MAP_IMAGE_CACHE_TIMEOUT = 10 * 60
+
+def token_cache_key(contract_address, chain):
+    return f"token:{chain}:{contract_address}"
+
+def bubble_map_cache_key(contract_address):
+    return f"bubble_map_png:{contract_address}"
+
+# Token summaries are cached as plain field values so any process can rebuild the model instance
+def cache_token_summary(token):
+    fields = {field.attname: getattr(token, field.attname) for field in TokenData._meta.concrete_fields}
+    cache.set(token_cache_key(token.contract_address, token.chain), fields, TOKEN_SUMMARY_CACHE_TIMEOUT)
+
+def get_cached_token_summary(contract_address, chain):
+    fields = cache.get(token_cache_key(contract_address, chain))
+    return TokenData(**fields) if fields else None
+
+# Function to download the CoinGecko coin list and index it by platform and contract address.
+# Each platform index is stored in the shared cache so processes don't each download the list.
+def load_coingecko_coin_index(platform):
+    response = requests.get(COINGECKO_COINS_LIST_URL)
+    if response.status_code != 200:
+        logger.error(f"CoinGecko coins list API error: {response.status_code}")
+        return None
 
-# Cache for CoinGecko coin list to avoid repeated API calls
-COINGECKO_COIN_MAPPING = None
+    indexes = {name: {} for name in COINGECKO_PLATFORMS.values()}
+    for coin in response.json():
+        for name, address in (coin.get('platforms') or {}).items():
+            if name in indexes and address:
+                # First listed coin wins, as with the old linear scan over the coins list
+                indexes[name].setdefault(address, coin['id'])
+    cache.set_many({f"coingecko_coin_index:{name}": index for name, index in indexes.items()}, COINGECKO_COIN_INDEX_TIMEOUT)
+    return indexes[platform]
 
 # Function to map contract address to CoinGecko coin_id
 def get_coingecko_coin_id(contract_address, chain):
-    global COINGECKO_COIN_MAPPING
     try:
-        if COINGECKO_COIN_MAPPING is None:
-            response = requests.get(COINGECKO_COINS_LIST_URL)
-            if response.status_code != 200:
-                logger.error(f"CoinGecko coins list API error: {response.status_code}")
-                return None
-            COINGECKO_COIN_MAPPING = response.json()
-
-        # Map chain to CoinGecko platform
-        chain_mapping = {
-            'eth': 'ethereum',
-            'bsc': 'binance-smart-chain',
-            'ftm': 'fantom',
-            'avax': 'avalanche',
-            'cro': 'cronos',
-            'arbi': 'arbitrum',
-            'poly': 'polygon-pos',
-            'base': 'base',
-            'sol': 'solana',
-            'sonic': 'sonic'  # Assuming CoinGecko supports this chain
-        }
-        platform = chain_mapping.get(chain)
+        platform = COINGECKO_PLATFORMS.get(chain)
         if not platform:
             logger.error(f"Unsupported chain: {chain}")
             return None
 
+        coin_index = cache.get(f"coingecko_coin_index:{platform}")
+        if coin_index is None:
+            coin_index = load_coingecko_coin_index(platform)
+            if coin_index is None:
+                return None
+
         # Find the coin with the matching contract address
-        for coin in COINGECKO_COIN_MAPPING:
-            platforms = coin.get('platforms', {})
-            if platforms.get(platform) == contract_address:
-                return coin['id']
-        logger.error(f"No CoinGecko coin found for contract address {contract_address} on chain {chain}")
-        return None
+        coin_id = coin_index.get(contract_address)
+        if not coin_id:
+            logger.error(f"No CoinGecko coin found for contract address {contract_address} on chain {chain}")
+        return coin_id
     except Exception as e:
         logger.error(f"Error mapping contract address to CoinGecko coin_id: {e}")
         return None
 
+# Function to pull the USD market figures out of a CoinGecko coin data response
+def extract_coingecko_market_data(data):
+    market_data = data.get('market_data', {})
+    return {
+        'market_cap': market_data.get('market_cap', {}).get('usd', 0),
+        'price': market_data.get('current_price', {}).get('usd', 0),
+        'volume': market_data.get('total_volume', {}).get('usd', 0)
+    }
+
+# Function to record a fully read upstream response; a recording failure never affects the live result
+def save_snapshot(snapshot_key, source, response):
+    try:
+        SNAPSHOT_STORE.save(*snapshot_key, source, response.content, response.status_code)
+    except Exception as e:
+        logger.error(f"Error recording {source} snapshot: {e}")
+
 # Function to fetch token market data from CoinGecko
-def fetch_coingecko_data(coin_id):
+def fetch_coingecko_data(coin_id, snapshot_key=None):
     try:
         if not coin_id:
             return None
         response = requests.get(COINGECKO_COIN_DATA_URL.format(coin_id))
+        if SNAPSHOT_STORE and snapshot_key:
+            save_snapshot(snapshot_key, 'coingecko', response)
         if response.status_code != 200:
             logger.error(f"CoinGecko coin data API error: {response.status_code}")
             return None
-        data = response.json()
-        market_data = data.get('market_data', {})
-        return {
-            'market_cap': market_data.get('market_cap', {}).get('usd', 0),
-            'price': market_data.get('current_price', {}).get('usd', 0),
-            'volume': market_data.get('total_volume', {}).get('usd', 0)
-        }
+        return extract_coingecko_market_data(response.json())
     except Exception as e:
         logger.error(f"Error fetching CoinGecko data: {e}")
         return None
 
-# Function to fetch token data and identify top traders (synchronous)
-def fetch_token_data_sync(contract_address, chain='eth'):
+# Function to fetch the CoinGecko, Bubblemaps and Score responses for a token from the network
+def fetch_token_responses(contract_address, chain):
+    # Every response of one analysis shares fetched_at so snapshots can be replayed together
+    fetched_at = time.time()
+    snapshot_key = (chain, contract_address, fetched_at)
+
+    # Fetch market data from CoinGecko
+    logger.info(f"Fetching CoinGecko data for {contract_address} on chain {chain}")
+    coin_id = get_coingecko_coin_id(contract_address, chain)
+    logger.info(f"CoinGecko coin_id: {coin_id}")
+    coingecko_data = fetch_coingecko_data(coin_id, snapshot_key) if coin_id else None
+
+    # Fetch from Bubblemaps API (map-data endpoint), streaming the body into a compact node/link index
+    params = {'token': contract_address, 'chain': chain}
+    logger.info(f"Sending request to Bubblemaps API: {BUBBLEMAPS_API_URL} with params {params}")
+    with requests.get(BUBBLEMAPS_API_URL, params=params, stream=True) as bubble_response:
+        logger.info(f"Bubblemaps API response status: {bubble_response.status_code}")
+        if bubble_response.status_code != 200:
+            if SNAPSHOT_STORE:
+                save_snapshot(snapshot_key, 'bubblemaps', bubble_response)
+            logger.error(f"Bubblemaps API error: {bubble_response.status_code} - {bubble_response.text[:500]}")
+            return None
+        bubble_response.raw.decode_content = True
+        if SNAPSHOT_STORE:
+            with SNAPSHOT_STORE.record(*snapshot_key, 'bubblemaps', bubble_response.raw) as stream:
+                map_data = parse_map_data(stream)
+        else:
+            map_data = parse_map_data(bubble_response.raw)
+
+    # Fetch from Score API (map-metadata endpoint)
+    score_params = {'chain': chain, 'token': contract_address}
+    logger.info(f"Sending request to Score API: {SCORE_API_URL} with params {score_params}")
+    score_response = requests.get(SCORE_API_URL, params=score_params)
+    logger.info(f"Score API response status: {score_response.status_code}")
+    logger.info(f"Score API response content: {score_response.text}")
+    if SNAPSHOT_STORE:
+        save_snapshot(snapshot_key, 'score', score_response)
+    score_data = score_response.json()
+
+    return coingecko_data, map_data, score_data
+
+# Function to load the recorded responses for a token from the snapshot store instead of the network
+def load_token_snapshots(contract_address, chain, replay_at=None):
+    if not SNAPSHOT_STORE:
+        logger.error("Snapshot replay requested but SNAPSHOT_DIR is not set.")
+        return None
+
+    bubble_entry = SNAPSHOT_STORE.latest(chain, contract_address, 'bubblemaps', replay_at)
+    if not bubble_entry:
+        logger.error(f"No Bubblemaps snapshot for {contract_address} on chain {chain}")
+        return None
+    logger.info(f"Replaying snapshots for {contract_address} on chain {chain} fetched at {bubble_entry.fetched_at}")
+    if bubble_entry.status_code != 200:
+        logger.error(f"Bubblemaps API error (replayed): {bubble_entry.status_code}")
+        return None
+    with SNAPSHOT_STORE.open(bubble_entry.digest) as stream:
+        map_data = parse_map_data(stream)
+
+    # Pair with the Score and CoinGecko responses recorded in the same fetch run only,
+    # so a response missing from this run is never filled in from an older one
+    score_entry = SNAPSHOT_STORE.exact(chain, contract_address, 'score', bubble_entry.fetched_at)
+    if not score_entry:
+        logger.error(f"Score response not recorded for {contract_address} on chain {chain} at {bubble_entry.fetched_at}")
+        return None
+    score_data = json.loads(SNAPSHOT_STORE.load(score_entry.digest))
+
+    coingecko_data = None
+    coingecko_entry = SNAPSHOT_STORE.exact(chain, contract_address, 'coingecko', bubble_entry.fetched_at)
+    if coingecko_entry and coingecko_entry.status_code == 200:
+        coingecko_data = extract_coingecko_market_data(json.loads(SNAPSHOT_STORE.load(coingecko_entry.digest)))
+
+    return coingecko_data, map_data, score_data
+
+# Function to fetch fresh token data from the upstream APIs (or replay it) and identify top traders (synchronous)
+def fetch_upstream_token_data(contract_address, chain='eth', replay=False, replay_at=None):
     try:
-        # Check if data is cached
-        token = TokenData.objects.filter(contract_address=contract_address, chain=chain).first()
-        if token:
-            logger.info(f"Using cached data for {contract_address} on chain {chain}")
-            return token
+        if replay:
+            responses = load_token_snapshots(contract_address, chain, replay_at)
+        else:
+            responses = fetch_token_responses(contract_address, chain)
+        if not responses:
+            return None
+        coingecko_data, map_data, score_data = responses
 
-        # Fetch market data from CoinGecko
-        logger.info(f"Fetching CoinGecko data for {contract_address} on chain {chain}")
-        coin_id = get_coingecko_coin_id(contract_address, chain)
-        logger.info(f"CoinGecko coin_id: {coin_id}")
-        coingecko_data = fetch_coingecko_data(coin_id) if coin_id else None
         if coingecko_data:
             market_cap = coingecko_data['market_cap']
             price = coingecko_data['price']
@@ -147,25 +295,8 @@ def fetch_token_data_sync(contract_address, chain='eth'):
             volume = 0
             logger.info("No CoinGecko data found, using defaults: market_cap=0, price=0, volume=0")
 
-        # Fetch from Bubblemaps API (map-data endpoint)
-        params = {'token': contract_address, 'chain': chain}
-        logger.info(f"Sending request to Bubblemaps API: {BUBBLEMAPS_API_URL} with params {params}")
-        bubble_response = requests.get(BUBBLEMAPS_API_URL, params=params)
-        logger.info(f"Bubblemaps API response status: {bubble_response.status_code}")
-        logger.info(f"Bubblemaps API response content: {bubble_response.text}")
-        if bubble_response.status_code != 200:
-            logger.error(f"Bubblemaps API error: {bubble_response.status_code} - {bubble_response.text}")
-            return None
-        bubble_data = bubble_response.json()
-        logger.info(f"Bubblemaps API data: {bubble_data}")
-
-        # Fetch from Score API (map-metadata endpoint)
-        score_params = {'chain': chain, 'token': contract_address}
-        logger.info(f"Sending request to Score API: {SCORE_API_URL} with params {score_params}")
-        score_response = requests.get(SCORE_API_URL, params=score_params)
-        logger.info(f"Score API response status: {score_response.status_code}")
-        logger.info(f"Score API response content: {score_response.text}")
-        score_data = score_response.json()
+        logger.info(f"Bubblemaps map data: {len(map_data.addresses)} nodes, {len(map_data)} links")
+
         if score_data.get('status') != 'OK':
             logger.error(f"Score API error: {score_data.get('message', 'Unknown error')}")
             return None
@@ -177,56 +308,52 @@ def fetch_token_data_sync(contract_address, chain='eth'):
         percent_in_cexs = identified_supply.get('percent_in_cexs', 0)
         percent_in_contracts = identified_supply.get('percent_in_contracts', 0)
 
-        # Identify top traders from transfer data (links)
-        links = bubble_data.get('links', [])
-        trader_volume = defaultdict(float)
-        connections = defaultdict(int)
-
-        # Calculate trading volume per wallet based on links
-        for link in links:
-            source_idx = link.get('source')
-            target_idx = link.get('target')
-            forward = link.get('forward', 0)
-            backward = link.get('backward', 0)
-
-            # Map indices to wallet addresses
-            nodes = bubble_data.get('nodes', [])
-            source_address = nodes[source_idx]['address'] if source_idx < len(nodes) else None
-            target_address = nodes[target_idx]['address'] if target_idx < len(nodes) else None
-
-            if source_address and target_address:
-                # Sum forward and backward transfers to get total trading volume for each wallet
-                trader_volume[source_address] += forward + backward
-                trader_volume[target_address] += forward + backward
-
-                # Track connections (number of transfers between wallets)
-                connection_key = tuple(sorted([source_address, target_address]))
-                connections[connection_key] += 1
-
-        # Get top 5 traders by volume
-        top_traders = sorted(trader_volume.items(), key=lambda x: x[1], reverse=True)[:5]
-        top_traders_dict = {trader: volume for trader, volume in top_traders}
-
-        # Format connections for top traders
-        trader_connections = {}
-        top_trader_addresses = set(trader for trader, _ in top_traders)
-        for (wallet1, wallet2), count in connections.items():
-            if wallet1 in top_trader_addresses and wallet2 in top_trader_addresses:
-                trader_connections[f"{wallet1}-{wallet2}"] = count
+        # Identify top traders and their connections from transfer data (links)
+        top_traders_dict, trader_connections = aggregate_top_traders(map_data)
+
+        return {
+            'market_cap': market_cap,
+            'price': price,
+            'volume': volume,
+            'decentralization_score': decentralization_score,
+            'percent_in_cexs': percent_in_cexs,
+            'percent_in_contracts': percent_in_contracts,
+            'top_traders': top_traders_dict,
+            'trader_connections': trader_connections
+        }
+    except Exception as e:
+        logger.error(f"Error fetching token data: {str(e)}")
+        return None
+
+# Function to fetch token data, using the cached row when available (synchronous)
+def fetch_token_data_sync(contract_address, chain='eth', replay=None, replay_at=None):
+    try:
+        if replay is None:
+            replay = SNAPSHOT_REPLAY
+        if replay:
+            # Replayed data is returned unsaved so offline runs never read or write the cache
+            token_fields = fetch_upstream_token_data(contract_address, chain, replay=True, replay_at=replay_at)
+            return TokenData(contract_address=contract_address, chain=chain, **token_fields) if token_fields else None
+
+        # Check the shared cache, then the database
+        token = get_cached_token_summary(contract_address, chain)
+        if token:
+            logger.info(f"Using shared cache data for {contract_address} on chain {chain}")
+            return token
+
+        token = TokenData.objects.filter(contract_address=contract_address, chain=chain).first()
+        if token:
+            logger.info(f"Using cached data for {contract_address} on chain {chain}")
+            cache_token_summary(token)
+            return token
+
+        token_fields = fetch_upstream_token_data(contract_address, chain)
+        if not token_fields:
+            return None
 
         # Cache the data
-        token = TokenData.objects.create(
-            contract_address=contract_address,
-            chain=chain,
-            market_cap=market_cap,
-            price=price,
-            volume=volume,
-            decentralization_score=decentralization_score,
-            percent_in_cexs=percent_in_cexs,
-            percent_in_contracts=percent_in_contracts,
-            top_traders=top_traders_dict,
-            trader_connections=trader_connections
-        )
+        token = TokenData.objects.create(contract_address=contract_address, chain=chain, **token_fields)
+        cache_token_summary(token)
         logger.info(f"Token data cached: {contract_address} on chain {chain}")
         return token
     except Exception as e:
@@ -238,9 +365,106 @@ async def fetch_token_data(contract_address, chain='eth'):
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(None, fetch_token_data_sync, contract_address, chain)
 
-# Function to take a screenshot of the bubble map (synchronous)
+# Function to add a token to a chat's watchlist (synchronous)
+def watch_token_sync(chat_id, contract_address, chain):
+    _, created = WatchedToken.objects.get_or_create(chat_id=chat_id, contract_address=contract_address, chain=chain)
+    return created
+
+# Function to remove a token from a chat's watchlist, on every chain if none is given (synchronous)
+def unwatch_token_sync(chat_id, contract_address, chain=None):
+    watched = WatchedToken.objects.filter(chat_id=chat_id, contract_address=contract_address)
+    if chain:
+        watched = watched.filter(chain=chain)
+    deleted, _ = watched.delete()
+    return deleted > 0
+
+# Function to remove every watched token of a chat (synchronous)
+def unwatch_chat_sync(chat_id):
+    deleted, _ = WatchedToken.objects.filter(chat_id=chat_id).delete()
+    return deleted
+
+# Function to pick the next watchlist batch: least recently refreshed first, then the most watched
+def get_watchlist_batch_sync(batch_size):
+    watchers = defaultdict(list)
+    for contract_address, chain, chat_id in WatchedToken.objects.values_list('contract_address', 'chain', 'chat_id'):
+        watchers[(contract_address, chain)].append(chat_id)
+
+    # Forget refresh times of tokens nobody watches anymore
+    for key in list(WATCHLIST_LAST_REFRESHED):
+        if key not in watchers:
+            del WATCHLIST_LAST_REFRESHED[key]
+
+    ordered = sorted(watchers.items(), key=lambda item: (WATCHLIST_LAST_REFRESHED.get(item[0], 0), -len(item[1])))
+    return ordered[:batch_size]
+
+# Function to describe how freshly fetched token data differs from the stored snapshot
+def describe_token_changes(token, token_fields):
+    changes = []
+
+    old_score = token.decentralization_score or 0
+    new_score = token_fields['decentralization_score'] or 0
+    if old_score != new_score:
+        changes.append(f"Decentralization Score: {old_score:.2f}% → {new_score:.2f}%")
+
+    # Volumes move on every transfer, so only a changed set of top traders or a large relative
+    # volume swing counts; small float differences alone must not trigger a write and a message
+    old_traders = token.top_traders or {}
+    new_traders = token_fields['top_traders']
+    entered = [trader for trader in new_traders if trader not in old_traders]
+    left = [trader for trader in old_traders if trader not in new_traders]
+    if entered:
+        changes.append(f"New top traders: {', '.join(entered)}")
+    if left:
+        changes.append(f"No longer top traders: {', '.join(left)}")
+    if not entered and not left:
+        moved = [
+            trader for trader, volume in new_traders.items()
+            if abs(volume - old_traders[trader]) > WATCHLIST_VOLUME_CHANGE * max(abs(old_traders[trader]), 1e-9)
+        ]
+        if moved:
+            changes.append(f"Top trader volumes changed by more than {WATCHLIST_VOLUME_CHANGE:.0%}: {', '.join(moved)}")
+
+    old_connections = token.trader_connections or {}
+    new_connections = token_fields['trader_connections']
+    if old_connections != new_connections:
+        changes.append(f"Connections between top traders changed ({len(old_connections)} → {len(new_connections)})")
+
+    return changes
+
+# Function to refresh a watched token, writing the snapshot only when something changed (synchronous)
+def refresh_watched_token_sync(contract_address, chain):
+    try:
+        token_fields = fetch_upstream_token_data(contract_address, chain)
+        if not token_fields:
+            return []
+
+        token = TokenData.objects.filter(contract_address=contract_address, chain=chain).first()
+        if not token:
+            TokenData.objects.create(contract_address=contract_address, chain=chain, **token_fields)
+            logger.info(f"Token data cached: {contract_address} on chain {chain}")
+            return []
+
+        changes = describe_token_changes(token, token_fields)
+        if changes:
+            for field, value in token_fields.items():
+                setattr(token, field, value)
+            token.save()
+            cache_token_summary(token)
+            cache.delete(bubble_map_cache_key(contract_address))
+            logger.info(f"Watched token changed: {contract_address} on chain {chain}")
+        return changes
+    except Exception as e:
+        logger.error(f"Error refreshing watched token: {str(e)}")
+        return []
+
+# Function to take a PNG screenshot of the bubble map (synchronous), reusing a cached render when available
 def take_bubble_map_screenshot_sync(contract_address):
+    cache_key = bubble_map_cache_key(contract_address)
     try:
+        image = cache.get(cache_key)
+        if image:
+            logger.info(f"Using cached bubble map for {contract_address}")
+            return image
         options = webdriver.ChromeOptions()
         options.add_argument('--headless')  # Run in headless mode
         options.add_argument('--no-sandbox')  # Required for some environments
@@ -249,18 +473,16 @@ def take_bubble_map_screenshot_sync(contract_address):
         driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
 
         # URL of the Django view rendering the bubble map
-        url = f"http://127.0.0.1:8000/bubble_map/{contract_address}/"
+        url = f"{BUBBLE_MAP_BASE_URL}/bubble_map/{contract_address}/"
         logger.info(f"Attempting to access URL: {url}")
         driver.get(url)
         driver.set_window_size(800, 600)
         # Wait for the chart to render (e.g., 5 seconds)
-        import time
         time.sleep(5)
-        screenshot_path = f"screenshot_{contract_address}.png"
-        logger.info(f"Saving screenshot to: {screenshot_path}")
-        driver.save_screenshot(screenshot_path)
+        image = driver.get_screenshot_as_png()
         driver.quit()
-        return screenshot_path
+        cache.set(cache_key, image, BUBBLE_MAP_IMAGE_CACHE_TIMEOUT)
+        return image
     except Exception as e:
         logger.error(f"Error taking screenshot: {e}")
         return None
@@ -273,14 +495,15 @@ async def take_bubble_map_screenshot(contract_address):
 # Telegram bot handlers with retry logic
 async def start(update: Update, context: ContextTypes):
     # Set up the menu button with retries
-    bot = Bot(token=TELEGRAM_TOKEN)
     commands = [
         BotCommand("help", "Get help"),
         BotCommand("about", "About this bot"),
+        BotCommand("watch", "Watch a token for holder changes"),
+        BotCommand("unwatch", "Stop watching a token"),
     ]
     for attempt in range(3):
         try:
-            await bot.set_my_commands(commands)
+            await context.bot.set_my_commands(commands)
             break
         except TimedOut:
             logger.warning(f"Telegram API timed out on attempt {attempt + 1}. Retrying...")
@@ -365,15 +588,15 @@ async def button_callback(update: Update, context: ContextTypes):
             return
 
         # Take a screenshot of the bubble map with retries
-        screenshot_path = None
+        screenshot = None
         for attempt in range(3):
             try:
-                screenshot_path = await take_bubble_map_screenshot(contract_address)
+                screenshot = await take_bubble_map_screenshot(contract_address)
                 break
             except TimedOut:
                 logger.warning(f"Telegram API timed out on attempt {attempt + 1}. Retrying...")
                 await asyncio.sleep(2)
-        if not screenshot_path:
+        if not screenshot:
             for attempt in range(3):
                 try:
                     await query.message.reply_text("Sorry, I couldn't generate the bubble map screenshot.")
@@ -388,8 +611,7 @@ async def button_callback(update: Update, context: ContextTypes):
         # Send the screenshot with retries
         for attempt in range(3):
             try:
-                with open(screenshot_path, 'rb') as photo:
-                    await query.message.reply_photo(photo=photo)
+                await query.message.reply_photo(photo=screenshot)
                 break
             except TimedOut:
                 logger.warning(f"Telegram API timed out on attempt {attempt + 1}. Retrying...")
@@ -406,9 +628,6 @@ async def button_callback(update: Update, context: ContextTypes):
                 logger.error("Failed to send 'failed to send screenshot' message after multiple attempts.")
             return
 
-        # Clean up
-        os.remove(screenshot_path)
-
 async def handle_message(update: Update, context: ContextTypes):
     message_text = update.message.text.strip()
     # Check if the user specified a chain (e.g., "0x123... bsc")
@@ -491,7 +710,8 @@ async def help_command(update: Update, context: ContextTypes):
                      "1. Send a token contract address to analyze top traders (e.g., '0x123...').\n"
                      "2. Optionally specify the chain (e.g., '0x123... bsc'). Default is eth.\n"
                      "3. Use the buttons to view the trader bubble map or analyze another token.\n"
-                     "4. Use the menu for more options."
+                     "4. Use /watch <address> [chain] to get a message when top traders, connections or the decentralization score change, and /unwatch <address> [chain] to stop.\n"
+                     "5. Use the menu for more options."
             )
             break
         except TimedOut:
@@ -516,15 +736,112 @@ async def about_command(update: Update, context: ContextTypes):
     else:
         logger.error("Failed to send about message after multiple attempts.")
 
+async def watch_command(update: Update, context: ContextTypes):
+    # Watch the given address, or the last analyzed token if none is given
+    if context.args:
+        contract_address = context.args[0]
+        chain = context.args[1] if len(context.args) > 1 else "eth"
+    else:
+        contract_address = context.user_data.get("last_contract_address")
+        chain = context.user_data.get("chain", "eth")
+
+    if not contract_address:
+        text = "Usage: /watch <contract address> [chain]"
+    else:
+        # Make sure there is a snapshot to compare future refreshes against
+        token_data = await fetch_token_data(contract_address, chain=chain)
+        if not token_data:
+            text = "Sorry, I couldn't fetch data for that token. Please try another address."
+        else:
+            loop = asyncio.get_event_loop()
+            created = await loop.run_in_executor(None, watch_token_sync, update.effective_chat.id, contract_address, chain)
+            if created:
+                text = (f"Watching {contract_address} (Chain: {chain}). 🔔\n"
+                        "I'll message you when its top traders, connections or decentralization score change.")
+            else:
+                text = f"{contract_address} (Chain: {chain}) is already on your watchlist."
+
+    for attempt in range(3):
+        try:
+            await context.bot.send_message(chat_id=update.effective_chat.id, text=text)
+            break
+        except TimedOut:
+            logger.warning(f"Telegram API timed out on attempt {attempt + 1}. Retrying...")
+            await asyncio.sleep(2)
+    else:
+        logger.error("Failed to send watch message after multiple attempts.")
+
+async def unwatch_command(update: Update, context: ContextTypes):
+    if not context.args:
+        text = "Usage: /unwatch <contract address> [chain]"
+    else:
+        contract_address = context.args[0]
+        chain = context.args[1] if len(context.args) > 1 else None
+        loop = asyncio.get_event_loop()
+        deleted = await loop.run_in_executor(None, unwatch_token_sync, update.effective_chat.id, contract_address, chain)
+        if deleted:
+            text = f"Stopped watching {contract_address}."
+        else:
+            text = f"{contract_address} is not on your watchlist."
+
+    for attempt in range(3):
+        try:
+            await context.bot.send_message(chat_id=update.effective_chat.id, text=text)
+            break
+        except TimedOut:
+            logger.warning(f"Telegram API timed out on attempt {attempt + 1}. Retrying...")
+            await asyncio.sleep(2)
+    else:
+        logger.error("Failed to send unwatch message after multiple attempts.")
+
+# Scheduled job: refresh a rate-limited batch of watched tokens and notify watchers of changes
+async def refresh_watchlist(context: ContextTypes):
+    loop = asyncio.get_event_loop()
+    batch = await loop.run_in_executor(None, get_watchlist_batch_sync, WATCHLIST_BATCH_SIZE)
+    for index, ((contract_address, chain), chat_ids) in enumerate(batch):
+        if index:
+            await asyncio.sleep(WATCHLIST_REQUEST_DELAY)
+        changes = await loop.run_in_executor(None, refresh_watched_token_sync, contract_address, chain)
+        WATCHLIST_LAST_REFRESHED[(contract_address, chain)] = time.monotonic()
+        if not changes:
+            continue
+
+        text = f"🔔 Watchlist update for {contract_address} (Chain: {chain})\n" + "\n".join(f"  - {change}" for change in changes)
+        for chat_id in chat_ids:
+            for attempt in range(3):
+                try:
+                    await context.bot.send_message(chat_id=chat_id, text=text)
+                    break
+                except TimedOut:
+                    logger.warning(f"Telegram API timed out on attempt {attempt + 1}. Retrying...")
+                    await asyncio.sleep(2)
+                except Forbidden as e:
+                    # The user blocked the bot or left the chat; stop watching on their behalf
+                    logger.warning(f"Removing chat {chat_id} from the watchlist: {e}")
+                    await loop.run_in_executor(None, unwatch_chat_sync, chat_id)
+                    break
+                except TelegramError as e:
+                    # One failing chat must not stop the others or the rest of the batch
+                    logger.error(f"Failed to send watchlist update to chat {chat_id}: {e}")
+                    break
+            else:
+                logger.error(f"Failed to send watchlist update to chat {chat_id} after multiple attempts.")
+
 # Main function to run the bot
 def main():
     # Start the Telegram bot
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+    application = Application.builder().token(TELEGRAM_TOKEN).base_url(TELEGRAM_API_URL).build()
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("about", about_command))
+    application.add_handler(CommandHandler("watch", watch_command))
+    application.add_handler(CommandHandler("unwatch", unwatch_command))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     application.add_handler(CallbackQueryHandler(button_callback))
+    if application.job_queue:
+        application.job_queue.run_repeating(refresh_watchlist, interval=WATCHLIST_REFRESH_INTERVAL, first=WATCHLIST_REFRESH_INTERVAL)
+    else:
+        logger.warning("JobQueue unavailable (install python-telegram-bot[job-queue]); watchlist refresher disabled.")
     logger.info("Bot started...")
     application.run_polling()
 
@@ -0,0 +1,196 @@
+# bot/cache.py
+"SQLite cache backend shared by every bot and web process on the host"
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCache(BaseCache):
+    """
+    Cache stored in a single SQLite file (WAL mode, memory-mapped reads), so
+    gunicorn workers and the polling worker share one copy of the coin index,
+    token summaries and rendered images.
+
+    OPTIONS:
+        MAX_SIZE: total bytes of pickled values to keep; least recently used
+            entries are evicted past it (default 256 MB).
+        MAX_ENTRIES: entry count bound, same meaning as the built-in backends.
+
+    If the file cannot be opened or written (missing volume, disk full, locked
+    past the timeout), operations fall back to a per-process LocMemCache.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    # Skip rewriting the access time of entries read within this many seconds
+    access_resolution = 10
+    # Evict down to this fraction of MAX_SIZE so eviction is not run on every set
+    evict_to = 0.9
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = os.path.abspath(location)
+        options = params.get('OPTIONS', {})
+        self._max_size = int(options.get('MAX_SIZE', 256 * 1024 * 1024))
+        self._local = threading.local()
+        self._fallback = LocMemCache(f"fallback:{self._path}", params)
+        self._fallback_logged_at = 0
+
+    def _connection(self):
+        # One connection per thread and process; connections must not cross a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f"PRAGMA mmap_size={self._max_size}")
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, size INTEGER NOT NULL, accessed REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _use_fallback(self, error):
+        # Drop the broken connection and log at most once a minute
+        self._local.conn = None
+        now = time.time()
+        if now - self._fallback_logged_at > 60:
+            self._fallback_logged_at = now
+            logger.warning(f"Shared cache {self._path} unavailable, using process-local cache: {error}")
+        return self._fallback
+
+    def _write(self, conn, entries, timeout, only_if_missing=False):
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = []
+        for key, value in entries:
+            data = pickle.dumps(value, self.pickle_protocol)
+            rows.append((key, data, expires, len(data), now))
+        verb = 'INSERT OR IGNORE' if only_if_missing else 'INSERT OR REPLACE'
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if only_if_missing:
+                # An expired entry does not count as present
+                conn.executemany('DELETE FROM cache_entries WHERE key = ? AND expires IS NOT NULL AND expires <= ?',
+                                 [(row[0], now) for row in rows])
+            cursor = conn.executemany(
+                f"{verb} INTO cache_entries (key, value, expires, size, accessed) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return cursor.rowcount
+
+    def _evict(self, conn, now):
+        conn.execute('DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        count, total_size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries').fetchone()
+        if count <= self._max_entries and total_size <= self._max_size:
+            return
+        target_count = int(self._max_entries * self.evict_to)
+        target_size = int(self._max_size * self.evict_to)
+        evicted = []
+        for key, size in conn.execute('SELECT key, size FROM cache_entries ORDER BY accessed'):
+            if count <= target_count and total_size <= target_size:
+                break
+            evicted.append((key,))
+            count -= 1
+            total_size -= size
+        conn.executemany('DELETE FROM cache_entries WHERE key = ?', evicted)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            return self._write(self._connection(), [(key, value)], timeout, only_if_missing=True) > 0
+        except (sqlite3.Error, OSError) as e:
+            return self._use_fallback(e).add(key, value, timeout)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value, expires, accessed FROM cache_entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return default
+            value, expires, accessed = row
+            now = time.time()
+            if expires is not None and expires <= now:
+                return default
+            if now - accessed > self.access_resolution:
+                conn.execute('UPDATE cache_entries SET accessed = ? WHERE key = ?', (now, key))
+            return pickle.loads(value)
+        except (sqlite3.Error, OSError) as e:
+            return self._use_fallback(e).get(key, default)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            self._write(self._connection(), [(key, value)], timeout)
+        except (sqlite3.Error, OSError) as e:
+            self._use_fallback(e).set(key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        entries = [(self.make_and_validate_key(key, version=version), value) for key, value in data.items()]
+        try:
+            self._write(self._connection(), entries, timeout)
+        except (sqlite3.Error, OSError) as e:
+            fallback = self._use_fallback(e)
+            for key, value in entries:
+                fallback.set(key, value, timeout)
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            now = time.time()
+            cursor = self._connection().execute(
+                'UPDATE cache_entries SET expires = ?, accessed = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), now, key, now)
+            )
+            return cursor.rowcount > 0
+        except (sqlite3.Error, OSError) as e:
+            return self._use_fallback(e).touch(key, timeout)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            cursor = self._connection().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+            # Also drop any copy written while the shared file was unavailable
+            self._fallback.delete(key)
+            return cursor.rowcount > 0
+        except (sqlite3.Error, OSError) as e:
+            return self._use_fallback(e).delete(key)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            row = self._connection().execute(
+                'SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+            ).fetchone()
+            return row is not None
+        except (sqlite3.Error, OSError) as e:
+            return self._use_fallback(e).has_key(key)
+
+    def clear(self):
+        self._fallback.clear()
+        try:
+            self._connection().execute('DELETE FROM cache_entries')
+        except (sqlite3.Error, OSError) as e:
+            self._use_fallback(e)
+
+    def close(self, **kwargs):
+        # Connections are reused per thread for the life of the process
+        pass
@@ -0,0 +1,98 @@
+# bot/map_data.py
+import logging
+from array import array
+from collections import defaultdict
+
+import ijson
+
+logger = logging.getLogger(__name__)
+
+
+# Compact view of a Bubblemaps map-data payload: the node index (wallet address by
+# position) plus parallel arrays for the links. Nothing else from the payload is kept.
+class MapData:
+    __slots__ = ('addresses', 'sources', 'targets', 'volumes')
+
+    def __init__(self):
+        self.addresses = []
+        self.sources = array('l')
+        self.targets = array('l')
+        self.volumes = array('d')
+
+    def __len__(self):
+        return len(self.sources)
+
+
+# Node indexes must fit the compact link arrays; anything else can't match a node anyway
+def _is_index(value):
+    return isinstance(value, int) and 0 <= value < 2 ** 31
+
+
+# Function to stream a map-data JSON payload from a file-like object into MapData.
+# Only `nodes[].address` and `links[].{source,target,forward,backward}` are read, so
+# the full JSON tree is never materialized. Numbers are left as ijson's int/Decimal:
+# use_float=True makes the C backend reject integers beyond int64 anywhere in the payload.
+def parse_map_data(stream):
+    map_data = MapData()
+    address = None
+    link = None
+
+    for prefix, event, value in ijson.parse(stream):
+        if prefix == 'nodes.item':
+            if event == 'start_map':
+                address = None
+            elif event == 'end_map':
+                map_data.addresses.append(address)
+        elif prefix == 'nodes.item.address':
+            address = value
+        elif prefix == 'links.item':
+            if event == 'start_map':
+                link = {'source': None, 'target': None, 'forward': 0, 'backward': 0}
+            elif event == 'end_map':
+                source_idx = link['source']
+                target_idx = link['target']
+                if _is_index(source_idx) and _is_index(target_idx):
+                    map_data.sources.append(source_idx)
+                    map_data.targets.append(target_idx)
+                    map_data.volumes.append(float(link['forward'] or 0) + float(link['backward'] or 0))
+                link = None
+        elif link is not None and prefix.startswith('links.item.') and event == 'number':
+            key = prefix[len('links.item.'):]
+            if key in link:
+                link[key] = value
+
+    return map_data
+
+
+# Function to identify the top traders by volume and the connections between them
+def aggregate_top_traders(map_data, limit=5):
+    addresses = map_data.addresses
+    node_count = len(addresses)
+    trader_volume = defaultdict(float)
+    connections = defaultdict(int)
+
+    for source_idx, target_idx, volume in zip(map_data.sources, map_data.targets, map_data.volumes):
+        if not (0 <= source_idx < node_count and 0 <= target_idx < node_count):
+            continue
+        source_address = addresses[source_idx]
+        target_address = addresses[target_idx]
+        if source_address and target_address:
+            # Sum forward and backward transfers to get total trading volume for each wallet
+            trader_volume[source_address] += volume
+            trader_volume[target_address] += volume
+
+            # Track connections (number of transfers between wallets)
+            connection_key = (source_address, target_address) if source_address <= target_address else (target_address, source_address)
+            connections[connection_key] += 1
+
+    # Get top traders by volume
+    top_traders = sorted(trader_volume.items(), key=lambda x: x[1], reverse=True)[:limit]
+    top_traders_dict = {trader: volume for trader, volume in top_traders}
+
+    # Format connections for top traders
+    trader_connections = {}
+    for (wallet1, wallet2), count in connections.items():
+        if wallet1 in top_traders_dict and wallet2 in top_traders_dict:
+            trader_connections[f"{wallet1}-{wallet2}"] = count
+
+    return top_traders_dict, trader_connections
@@ -79,7 +79,7 @@ WSGI_APPLICATION = 'bot.wsgi.application'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.mysql'),
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
@@ -91,6 +91,20 @@ DATABASES = {
     }
 }
 
+# Cache shared by the web and bot processes on this host
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+CACHES = {
+    'default': {
+        'BACKEND': 'bot.cache.SQLiteCache',
+        'LOCATION': os.getenv('SHARED_CACHE_PATH', str(BASE_DIR / 'cache' / 'shared_cache.sqlite3')),
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_SIZE': int(os.getenv('SHARED_CACHE_MAX_SIZE', str(256 * 1024 * 1024))),  # Bytes
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -0,0 +1,173 @@
+# bot/snapshots.py
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+from collections import namedtuple
+from contextlib import closing, contextmanager
+
+logger = logging.getLogger(__name__)
+
+# One recorded upstream response; `digest` is the sha256 of the uncompressed body
+SnapshotEntry = namedtuple('SnapshotEntry', ['chain', 'address', 'fetched_at', 'source', 'digest', 'status_code'])
+
+
+# Reader that passes a response stream through while hashing and compressing it to disk.
+# Write failures are remembered rather than raised so the caller keeps reading the live body.
+class SnapshotRecorder:
+    def __init__(self, stream, objects_dir):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+        self.error = None
+        fd, self.tmp_path = tempfile.mkstemp(dir=objects_dir, suffix='.tmp')
+        self._raw_file = os.fdopen(fd, 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw_file, mode='wb', mtime=0)
+
+    def read(self, size=-1):
+        chunk = self._stream.read(size)
+        if chunk and self.error is None:
+            try:
+                self._hash.update(chunk)
+                self._file.write(chunk)
+            except OSError as e:
+                self.error = e
+        return chunk
+
+    def finish(self):
+        # Drain whatever the parser did not consume so the digest covers the full body
+        while self.read(64 * 1024):
+            pass
+        self.close()
+        if self.error is not None:
+            raise self.error
+        return self._hash.hexdigest()
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            self._raw_file.close()
+
+    def discard(self):
+        try:
+            self.close()
+        except OSError:
+            pass
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+# Content-addressed store of compressed upstream responses, indexed by (chain, address, fetched_at)
+class SnapshotStore:
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_path = os.path.join(root, 'index.sqlite3')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots ('
+                'chain TEXT NOT NULL, address TEXT NOT NULL, fetched_at REAL NOT NULL, '
+                'source TEXT NOT NULL, digest TEXT NOT NULL, status_code INTEGER)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS snapshots_lookup ON snapshots (chain, address, source, fetched_at)')
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json.gz")
+
+    def _store_object(self, tmp_path, digest):
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            # Identical body already stored
+            os.remove(tmp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    def _add_entry(self, chain, address, fetched_at, source, digest, status_code):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT INTO snapshots (chain, address, fetched_at, source, digest, status_code) VALUES (?, ?, ?, ?, ?, ?)',
+                (chain, address, fetched_at, source, digest, status_code)
+            )
+        logger.info(f"Snapshot saved: {source} for {address} on chain {chain} ({digest[:12]})")
+
+    # Save a fully read response body
+    def save(self, chain, address, fetched_at, source, content, status_code=200):
+        digest = hashlib.sha256(content).hexdigest()
+        if not os.path.exists(self.object_path(digest)):
+            fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as raw_file, gzip.GzipFile(fileobj=raw_file, mode='wb', mtime=0) as f:
+                f.write(content)
+            self._store_object(tmp_path, digest)
+        self._add_entry(chain, address, fetched_at, source, digest, status_code)
+        return digest
+
+    # Record a streamed response body while the caller reads from the yielded stream.
+    # Recording is best effort: on any failure it is logged and the caller still gets the body.
+    @contextmanager
+    def record(self, chain, address, fetched_at, source, stream, status_code=200):
+        try:
+            recorder = SnapshotRecorder(stream, self.objects_dir)
+        except Exception as e:
+            logger.error(f"Error recording {source} snapshot for {address}: {e}")
+            yield stream
+            return
+
+        try:
+            yield recorder
+        finally:
+            # Keep the body even if parsing failed, that is exactly the case worth replaying
+            try:
+                digest = recorder.finish()
+                self._store_object(recorder.tmp_path, digest)
+                self._add_entry(chain, address, fetched_at, source, digest, status_code)
+            except Exception as e:
+                try:
+                    recorder.discard()
+                except OSError:
+                    pass
+                logger.error(f"Error recording {source} snapshot for {address}: {e}")
+
+    # Latest snapshot of a source for a token, optionally as of a given fetched_at
+    def latest(self, chain, address, source, fetched_at=None):
+        query = 'SELECT chain, address, fetched_at, source, digest, status_code FROM snapshots WHERE chain = ? AND address = ? AND source = ?'
+        params = [chain, address, source]
+        if fetched_at is not None:
+            query += ' AND fetched_at <= ?'
+            params.append(fetched_at)
+        query += ' ORDER BY fetched_at DESC LIMIT 1'
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, params).fetchone()
+        return SnapshotEntry(*row) if row else None
+
+    # Snapshot of a source recorded in exactly the fetch run identified by fetched_at
+    def exact(self, chain, address, source, fetched_at):
+        query = ('SELECT chain, address, fetched_at, source, digest, status_code FROM snapshots '
+                 'WHERE chain = ? AND address = ? AND source = ? AND fetched_at = ? LIMIT 1')
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, (chain, address, source, fetched_at)).fetchone()
+        return SnapshotEntry(*row) if row else None
+
+    # All snapshots, optionally of one source, oldest first
+    def entries(self, source=None):
+        query = 'SELECT chain, address, fetched_at, source, digest, status_code FROM snapshots'
+        params = []
+        if source:
+            query += ' WHERE source = ?'
+            params.append(source)
+        query += ' ORDER BY fetched_at'
+        with closing(self._connect()) as conn:
+            return [SnapshotEntry(*row) for row in conn.execute(query, params)]
+
+    def open(self, digest):
+        return gzip.open(self.object_path(digest), 'rb')
+
+    def load(self, digest):
+        with self.open(digest) as f:
+            return f.read()